@@ -5,10 +5,48 @@ import numpy as np
 import pandas as pd
 import seaborn as sns
 
-from scipy.stats import pearsonr, mannwhitneyu, f_oneway
+from scipy.stats import mannwhitneyu, rankdata, f as f_snedecor, norm, t as t_student
 
 #####################################################################
 
+def _correlaciones_objetivo(matriz:np.ndarray, indice_objetivo:int, desviaciones:np.ndarray) -> np.ndarray:
+    '''
+    Calcula la correlación de Pearson de cada columna de "matriz" con la columna "indice_objetivo", reduciendo el numerador con un
+    único np.einsum sobre el objetivo centrado (sin construir una copia centrada de la matriz) y reutilizando las desviaciones típicas.
+    '''
+
+    medias = matriz.mean(axis=0, dtype=np.float64)
+    objetivo = (matriz[:, indice_objetivo] - medias[indice_objetivo]).astype(matriz.dtype)
+    numerador = np.einsum('i,ij->j', objetivo, matriz) - medias * objetivo.sum(dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        corr = numerador / (len(matriz) * desviaciones[indice_objetivo] * desviaciones)
+
+    return np.clip(corr, -1, 1)
+
+
+def _pvalue_pearson(corr:np.ndarray, n:int) -> np.ndarray:
+    '''
+    Calcula el p-valor bilateral del test de correlación de Pearson a partir de los coeficientes y del número de observaciones,
+    mediante el estadístico t con n - 2 grados de libertad.
+    '''
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t_calc = corr * np.sqrt((n - 2) / (1 - corr**2))
+
+    return 2 * t_student.sf(np.abs(t_calc), n - 2)
+
+
+def _rangos_empates(y:np.ndarray) -> tuple:
+    '''
+    Devuelve los rangos promedio de "y" y el término de corrección por empates (suma de t^3 - t) que utiliza el test de Mann-Whitney.
+    '''
+
+    rangos = rankdata(y)
+    _, repeticiones = np.unique(rangos, return_counts=True)
+
+    return rangos, (repeticiones**3 - repeticiones).sum()
+
+
 def describe_df(data:pd.DataFrame) -> pd.DataFrame:
     '''
     Genera una descripción esquemática de las variables de un DataFrame, devolviendo un nuevo DataFrame en el que cada columna corresponde a una variable
@@ -26,16 +64,23 @@ def describe_df(data:pd.DataFrame) -> pd.DataFrame:
         número de valores únicos y porcentaje de cardinalidad.
     '''
 
-    salida = {columna: [] for columna in data.columns}
-    for columna in salida.keys():
-        salida[columna].append(data[columna].dtype)
-        salida[columna].append(round(data[columna].isna().sum() / len(data) * 100, 1))
-        salida[columna].append(data[columna].nunique())
-        salida[columna].append(round(data[columna].nunique() / len(data) * 100, 2))
+    tipos = data.dtypes
+    if len(data) > 0 and tipos.nunique() == 1 and isinstance(tipos.iloc[0], np.dtype) and np.issubdtype(tipos.iloc[0], np.number):
+        matriz = np.sort(data.to_numpy(copy=False), axis=0)
+        nulos = pd.Series(np.isnan(matriz).sum(axis=0), index=data.columns)
+        cardinalidad = pd.Series((matriz[1:] != matriz[:-1]).sum(axis=0) + 1, index=data.columns) - nulos
+    else:
+        nulos = data.isna().sum(axis=0)
+        cardinalidad = data.nunique()
 
-    salida['Columnas'] = ['DATA_TYPE', 'MISSINGS (%)', 'UNIQUE_VALUES', 'CARDIN (%)']
+    salida = pd.DataFrame({
+        'DATA_TYPE': tipos,
+        'MISSINGS (%)': (nulos / len(data) * 100).round(1),
+        'UNIQUE_VALUES': cardinalidad,
+        'CARDIN (%)': (cardinalidad / len(data) * 100).round(2)
+    })
 
-    return pd.DataFrame(salida).set_index('Columnas')
+    return salida.T.rename_axis('Columnas')
 
 
 def tipifica_variables(data:pd.DataFrame, umbral_categoria:int, umbral_continua:float) -> pd.DataFrame:
@@ -60,21 +105,15 @@ def tipifica_variables(data:pd.DataFrame, umbral_categoria:int, umbral_continua:
 
     describe = describe_df(data)
 
-    salida = [[columna] for columna in data.columns]
-    for columna in salida:
-        tipo_sugerido = 'Numérica Discreta'
-        if describe.loc['UNIQUE_VALUES', columna].values[0] == 2:
-            tipo_sugerido = 'Binaria'
+    valores_unicos = describe.loc['UNIQUE_VALUES'].to_numpy(dtype=np.int64)
+    cardinalidad = describe.loc['CARDIN (%)'].to_numpy(dtype=np.float64)
+    tipo_sugerido = np.select(
+        [valores_unicos == 2, cardinalidad < umbral_categoria, cardinalidad >= umbral_continua],
+        ['Binaria', 'Categórica', 'Numérica Continua'],
+        default='Numérica Discreta'
+    )
 
-        elif describe.loc['CARDIN (%)', columna].values[0] < umbral_categoria:
-            tipo_sugerido = 'Categórica'
-
-        elif describe.loc['CARDIN (%)', columna].values[0] >= umbral_continua:
-            tipo_sugerido = 'Numérica Continua'
-
-        columna.append(tipo_sugerido)
-
-    return pd.DataFrame(salida, columns=['nombre_variable', 'tipo_sugerido'])
+    return pd.DataFrame({'nombre_variable': data.columns.to_list(), 'tipo_sugerido': tipo_sugerido.tolist()})
 
 
 def get_features_num_regression(data:pd.DataFrame, target_col:str, umbral_corr:float, pvalue:float=None) -> list:
@@ -109,14 +148,20 @@ def get_features_num_regression(data:pd.DataFrame, target_col:str, umbral_corr:f
     if not target_col in columnas_numericas:
         return print('La columna objetivo debe existir y ser numérica.')
 
-    salida = []
-    for columna in columnas_numericas:
-        if columna != target_col:
-            corr_calc, pvalue_calc = pearsonr(data[columna], data[target_col])
-            if corr_calc >= umbral_corr and pvalue_calc <= pvalue:
-                salida.append(columna)    
+    matriz = data[columnas_numericas].to_numpy(dtype=np.float64, na_value=np.nan)
+    desviaciones = matriz.std(axis=0)
+    con_varianza = desviaciones > 0
+    con_varianza[columnas_numericas.get_loc(target_col)] = True
+    if not con_varianza.all():
+        columnas_numericas, matriz, desviaciones = columnas_numericas[con_varianza], matriz[:, con_varianza], desviaciones[con_varianza]
 
-    return salida
+    corr_calc = _correlaciones_objetivo(matriz, columnas_numericas.get_loc(target_col), desviaciones)
+    pvalue_calc = _pvalue_pearson(corr_calc, len(matriz))
+
+    corr_calc[columnas_numericas.get_loc(target_col)] = np.nan
+    seleccion = (np.abs(corr_calc) >= umbral_corr) & (pvalue_calc <= pvalue)
+
+    return columnas_numericas[seleccion].to_list()
 
 
 def plot_features_num_regression(data:pd.DataFrame, target_col:str, columns:list=[], umbral_corr:float=0, pvalue:float=None) -> None:
@@ -149,11 +194,11 @@ def plot_features_num_regression(data:pd.DataFrame, target_col:str, columns:list
 
     columns_calc = get_features_num_regression(data, target_col, umbral_corr, pvalue)
 
+    columns_calc = set(columns_calc)
     columnas_pintar = [col for col in columns if col in columns_calc]
-    divisiones = math.ceil(len(columnas_pintar) / 4)
-    for div in range(divisiones):
-        col_div = [target_col] + columnas_pintar[4*div:4*(div+1)]
-        sns.pairplot(data[col_div], )
+    if columnas_pintar:
+        for bloque in np.array_split(np.array(columnas_pintar, dtype=object), math.ceil(len(columnas_pintar) / 4)):
+            sns.pairplot(data[[target_col] + bloque.tolist()])
     
     return columnas_pintar
 
@@ -178,8 +223,6 @@ def get_features_cat_regression(data:pd.DataFrame, target_col:str,  pvalue:float
         Lista de nombres de columnas categóricas cuya relación con la variable objetivo es significativa.
     '''
 
-    data = data.dropna(axis=0)
-
     if not(isinstance(data, pd.DataFrame) and isinstance(target_col, str) and isinstance(pvalue, (int, float))):
         return print('Introduce el tipo de variable adecuado para cada parámetro.')
     
@@ -188,16 +231,46 @@ def get_features_cat_regression(data:pd.DataFrame, target_col:str,  pvalue:float
     if not target_col in data.select_dtypes(include=['number']).columns:
         return print('La columna objetivo debe existir y ser numérica.')
 
+    categorias = {columna: pd.factorize(data[columna]) for columna in columnas_categoricas}
+    columnas_categoricas = [columna for columna in columnas_categoricas if len(categorias[columna][1]) > 1]
+    y_objetivo = data[target_col].to_numpy(dtype=np.float64, na_value=np.nan)
+    objetivo_valido = ~np.isnan(y_objetivo)
+    y_objetivo = y_objetivo[objetivo_valido] - np.nanmean(y_objetivo)
+    rangos_objetivo, empates_objetivo = _rangos_empates(y_objetivo)
     salida = []
     for columna in columnas_categoricas:
-        if data[columna].nunique() == 2:
-            grupo_a, grupo_b = [data[data[columna] == valor][target_col] for valor in data[columna].unique()]
-            _, p_valor = mannwhitneyu(grupo_a, grupo_b)
+        codigos, valores = categorias[columna]
+        codigos = codigos[objetivo_valido]
+        validas = codigos >= 0
+        if validas.all():
+            y, rangos, termino_empates = y_objetivo, rangos_objetivo, empates_objetivo
+        else:
+            y, codigos = y_objetivo[validas], codigos[validas]
+            rangos, termino_empates = _rangos_empates(y)
+        if len(codigos) < len(data):
+            codigos, valores = pd.factorize(codigos)
+        n, k = len(y), len(valores)
+        if k == 2:
+            mascara = codigos == 0
+            n_a = mascara.sum()
+            n_b = n - n_a
+            if min(n_a, n_b) <= 8 and termino_empates == 0:
+                _, p_valor = mannwhitneyu(y[mascara], y[~mascara])
+            else:
+                u_a = rangos[mascara].sum() - n_a * (n_a + 1) / 2
+                u_calc = max(u_a, n_a * n_b - u_a)
+                z_calc = (u_calc - n_a * n_b / 2 - 0.5) / np.sqrt(n_a * n_b / 12 * ((n + 1) - termino_empates / (n * (n - 1))))
+                p_valor = min(2 * norm.sf(z_calc), 1.0)
             if p_valor <= pvalue:
                 salida.append(columna)
         else:
-            lista = [data[data[columna] == valor][target_col] for valor in data[columna].unique()]
-            _, p_valor = f_oneway(*lista)
+            conteos = np.bincount(codigos, minlength=k)
+            medias = np.bincount(codigos, weights=y, minlength=k) / conteos
+            suma_entre = (conteos * (medias - y.mean())**2).sum()
+            suma_dentro = ((y - medias[codigos])**2).sum()
+            with np.errstate(divide='ignore', invalid='ignore'):
+                f_calc = (suma_entre / (k - 1)) / (suma_dentro / (n - k))
+            p_valor = f_snedecor.sf(f_calc, k - 1, n - k)
             if p_valor <= pvalue:
                 salida.append(columna)
             
@@ -239,33 +312,32 @@ def plot_features_cat_regression(data:pd.DataFrame, target_col:str, columns:list
 
     columns_calc = get_features_cat_regression(data, target_col, pvalue)
 
+    columns_calc = set(columns_calc)
     columnas_pintar = [col for col in columns if col in columns_calc]
 
     if with_individual_plot:
         for columna in columnas_pintar:
             valores = data[columna].unique()
-            divisiones = math.ceil(len(valores) / 4)
-            for div in range(divisiones):
-                ncols = min(4, len(valores)-div*4)
-                _, axs = plt.subplots(ncols=min(4, len(valores)-div*4), figsize = (5*ncols, 5))
-                for i, ax in enumerate(axs):
-                    idx = div * 4 + i
-                    sns.histplot(data[data[columna] == valores[idx]], x=target_col, ax=ax, fill=True, alpha=0.3, kde=True)
-                    ax.set_xlabel(valores[idx])
-                    if i != 0:
-                        ax.set_ylabel('')
-                    else:
-                        ax.set_ylabel(columna)
-
-    else:
-        divisiones = math.ceil(len(columnas_pintar) / 2)
-        for div in range(divisiones):
-            ncols = min(2, len(columnas_pintar)-div*2)
-            _, axs = plt.subplots(ncols=min(2, len(columnas_pintar)-div*2), figsize = (10*ncols, 10))
-            for i, ax in enumerate(axs):
-                idx = div * 2 + i
-                sns.histplot(data, x=target_col, hue=columnas_pintar[idx], ax=ax, fill=True, alpha=0.3, kde=True)
-                ax.set_xlabel(columnas_pintar[idx])
-                ax.set_ylabel('')
+            nrows, ncols = math.ceil(len(valores) / 4), min(4, len(valores))
+            _, axs = plt.subplots(nrows=nrows, ncols=ncols, squeeze=False, figsize = (5*ncols, 5*nrows))
+            for i, (ax, valor) in enumerate(zip(axs.flat, valores)):
+                sns.histplot(data[data[columna] == valor], x=target_col, ax=ax, fill=True, alpha=0.3, kde=True)
+                ax.set_xlabel(valor)
+                if i % 4 != 0:
+                    ax.set_ylabel('')
+                else:
+                    ax.set_ylabel(columna)
+            for ax in axs.flat[len(valores):]:
+                ax.set_visible(False)
+
+    elif columnas_pintar:
+        nrows, ncols = math.ceil(len(columnas_pintar) / 2), min(2, len(columnas_pintar))
+        _, axs = plt.subplots(nrows=nrows, ncols=ncols, squeeze=False, figsize = (10*ncols, 10*nrows))
+        for ax, columna in zip(axs.flat, columnas_pintar):
+            sns.histplot(data, x=target_col, hue=columna, ax=ax, fill=True, alpha=0.3, kde=True)
+            ax.set_xlabel(columna)
+            ax.set_ylabel('')
+        for ax in axs.flat[len(columnas_pintar):]:
+            ax.set_visible(False)
     
     return columnas_pintar
\ No newline at end of file
@@ -1,14 +1,142 @@
 import math
+import os
+
+from concurrent.futures import ThreadPoolExecutor
 
 import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
 import seaborn as sns
 
-from scipy.stats import pearsonr, mannwhitneyu, f_oneway
+from scipy.stats import mannwhitneyu, rankdata, f as f_snedecor, norm, t as t_student
+
+try:
+    from numba import njit, prange
+    NUMBA_DISPONIBLE = True
+except ImportError:
+    njit = lambda *args, **kwargs: (lambda funcion: funcion)
+    prange = range
+    NUMBA_DISPONIBLE = False
+
+UMBRAL_FP32 = 256 * 1024**2
+FILAS_BLOQUE = 65_536
 
 #####################################################################
 
+@njit(cache=True, parallel=True, fastmath=True, error_model='numpy')
+def _pearson_columnas(matriz:np.ndarray, y:np.ndarray) -> np.ndarray:
+    '''
+    Calcula en paralelo la correlación de Pearson entre cada columna de "matriz" y el vector "y" en dos pasadas por columna
+    (media y sumas centradas), sin construir la matriz de correlación completa.
+    '''
+
+    n, k = matriz.shape
+    media_y = y.mean()
+    corr = np.empty(k)
+    for j in prange(k):
+        media_x = 0.0
+        for i in range(n):
+            media_x += matriz[i, j]
+        media_x /= n
+
+        sxx, syy, sxy = 0.0, 0.0, 0.0
+        for i in range(n):
+            dx = matriz[i, j] - media_x
+            dy = y[i] - media_y
+            sxx += dx * dx
+            syy += dy * dy
+            sxy += dx * dy
+        corr[j] = sxy / np.sqrt(sxx * syy) if sxx > 0 and syy > 0 else np.nan
+
+    return corr
+
+
+@njit(cache=True, nogil=True, error_model='numpy')
+def _anova_codigos(y:np.ndarray, codigos:np.ndarray, k:int) -> float:
+    '''
+    Calcula el estadístico F del ANOVA de un factor a partir de la variable objetivo y de los códigos enteros (0..k-1) de cada grupo,
+    acumulando conteos, sumas y sumas de cuadrados en una sola pasada.
+    '''
+
+    n = y.size
+    conteos = np.zeros(k)
+    sumas = np.zeros(k)
+    total, suma_cuadrados = 0.0, 0.0
+    for i in range(n):
+        conteos[codigos[i]] += 1
+        sumas[codigos[i]] += y[i]
+        total += y[i]
+        suma_cuadrados += y[i] * y[i]
+
+    suma_entre = 0.0
+    for g in range(k):
+        suma_entre += sumas[g] * sumas[g] / conteos[g]
+
+    return ((suma_entre - total * total / n) / (k - 1)) / ((suma_cuadrados - suma_entre) / (n - k))
+
+
+def _momentos_columnas(matriz:np.ndarray) -> tuple:
+    '''
+    Calcula la media y la desviación típica de cada columna de "matriz" recorriéndola en bloques de FILAS_BLOQUE filas desplazados por
+    su primera fila, acumulando en float64. Así las matrices float32 no pierden precisión en columnas con media grande frente a su
+    dispersión y las columnas constantes obtienen una desviación exactamente nula.
+    '''
+
+    desplazamiento = matriz[:1].sum(axis=0)
+    suma, suma_cuadrados = np.zeros(matriz.shape[1]), np.zeros(matriz.shape[1])
+    for inicio in range(0, len(matriz), FILAS_BLOQUE):
+        bloque = matriz[inicio:inicio + FILAS_BLOQUE] - desplazamiento
+        suma += np.einsum('ij->j', bloque)
+        suma_cuadrados += np.einsum('ij,ij->j', bloque, bloque)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        media_desplazada = suma / len(matriz)
+        varianza = np.maximum(suma_cuadrados / len(matriz) - media_desplazada**2, 0)
+
+    return desplazamiento + media_desplazada, np.sqrt(varianza)
+
+
+def _correlaciones_objetivo(matriz:np.ndarray, indice_objetivo:int, medias:np.ndarray, desviaciones:np.ndarray) -> np.ndarray:
+    '''
+    Calcula la correlación de Pearson de cada columna de "matriz" con la columna "indice_objetivo", reduciendo el numerador con
+    np.einsum sobre bloques de FILAS_BLOQUE filas ya centrados (sin construir una copia centrada de la matriz completa) y reutilizando
+    las medias y desviaciones típicas de "_momentos_columnas". Admite matrices float32; la suma entre bloques se acumula en float64.
+    '''
+
+    medias_bloque = medias.astype(matriz.dtype)
+    objetivo = (matriz[:, indice_objetivo] - medias[indice_objetivo]).astype(matriz.dtype)
+    numerador = np.zeros(matriz.shape[1])
+    for inicio in range(0, len(matriz), FILAS_BLOQUE):
+        bloque = matriz[inicio:inicio + FILAS_BLOQUE] - medias_bloque
+        numerador += np.einsum('i,ij->j', objetivo[inicio:inicio + FILAS_BLOQUE], bloque)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        corr = numerador / (len(matriz) * desviaciones[indice_objetivo] * desviaciones)
+
+    return np.clip(corr, -1, 1)
+
+
+def _pvalue_pearson(corr:np.ndarray, n:int) -> np.ndarray:
+    '''
+    Calcula el p-valor bilateral del test de correlación de Pearson a partir de los coeficientes y del número de observaciones,
+    mediante el estadístico t con n - 2 grados de libertad.
+    '''
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t_calc = corr * np.sqrt((n - 2) / (1 - corr**2))
+
+    return 2 * t_student.sf(np.abs(t_calc), n - 2)
+
+
+def _rangos_empates(y:np.ndarray) -> tuple:
+    '''
+    Devuelve los rangos promedio de "y" y el término de corrección por empates (suma de t^3 - t) que utiliza el test de Mann-Whitney.
+    '''
+
+    rangos = rankdata(y)
+    _, repeticiones = np.unique(rangos, return_counts=True)
+
+    return rangos, (repeticiones**3 - repeticiones).sum()
+
+
 def describe_df(data:pd.DataFrame, umbral_categorica:int=10, umbral_continua:float=0.1, imprimir:bool=True) -> pd.DataFrame:
     '''
     Genera una descripción esquemática de las variables de un DataFrame, devolviendo un nuevo DataFrame en el que cada columna corresponde
@@ -43,41 +171,39 @@ def describe_df(data:pd.DataFrame, umbral_categorica:int=10, umbral_continua:flo
     if not(isinstance(imprimir, bool)):
         raise TypeError('La variable "imprimir" debe ser True/False.')
     
-    salida = {columna: [] for columna in data.columns}
-    for columna in salida.keys():
-        tipo = data[columna].dtype
-        nulos = data[columna].isna().sum()
-        cardinalidad = data[columna].nunique()
-        clasificacion = 'Bajo_Interes'
-
-        if cardinalidad == 2:
-            clasificacion = 'Categorica_Binaria'
-
-        elif cardinalidad <= umbral_categorica:
-            clasificacion = 'Categorica_Nominal'
-
-        elif pd.api.types.is_numeric_dtype(tipo) or pd.api.types.is_datetime64_any_dtype(tipo):
-            if cardinalidad / len(data) <= umbral_continua:
-                clasificacion = 'Numerica_Discreta'
-            else:
-                clasificacion = 'Numerica_Continua'
-
-        salida[columna].append(tipo)
-        salida[columna].append(nulos)
-        salida[columna].append(round(nulos / len(data) * 100, 1))
-        salida[columna].append(cardinalidad)
-        salida[columna].append(round(cardinalidad / len(data) * 100, 2))
-        salida[columna].append(clasificacion)
-
-    salida['Columnas'] = ['Tipo_Dato', 'Nulos', 'Nulos_%', 'Cardinalidad', 'Cardinalidad_%', 'Clasificacion_sugerida']
+    tipos = data.dtypes
+    if len(data) > 0 and tipos.nunique() == 1 and isinstance(tipos.iloc[0], np.dtype) and np.issubdtype(tipos.iloc[0], np.number):
+        matriz = np.sort(data.to_numpy(copy=False), axis=0)
+        nulos = pd.Series(np.isnan(matriz).sum(axis=0), index=data.columns)
+        cardinalidad = pd.Series((matriz[1:] != matriz[:-1]).sum(axis=0) + 1, index=data.columns) - nulos
+    else:
+        nulos = data.isna().sum(axis=0)
+        cardinalidad = data.nunique()
+
+    es_numerica = tipos.map(lambda tipo: pd.api.types.is_numeric_dtype(tipo) or pd.api.types.is_datetime64_any_dtype(tipo)).to_numpy(dtype=bool)
+    card = cardinalidad.to_numpy()
+    clasificacion = np.select(
+        [card == 2, card <= umbral_categorica, es_numerica & (card / len(data) <= umbral_continua), es_numerica],
+        ['Categorica_Binaria', 'Categorica_Nominal', 'Numerica_Discreta', 'Numerica_Continua'],
+        default='Bajo_Interes'
+    )
+
+    salida = pd.DataFrame({
+        'Tipo_Dato': tipos,
+        'Nulos': nulos,
+        'Nulos_%': (nulos / len(data) * 100).round(1),
+        'Cardinalidad': cardinalidad,
+        'Cardinalidad_%': (cardinalidad / len(data) * 100).round(2),
+        'Clasificacion_sugerida': pd.Series(clasificacion, index=data.columns, dtype=object)
+    })
 
     if imprimir:
         print(f'Clasificación sugerida para {len(data)} filas, con un umbral para categórica nominal de {umbral_categorica\
                 } sobre la cardinalidad y un umbral para númerica continua de {umbral_continua*100} % sobre la cardinalidad relativa.')
-    return pd.DataFrame(salida).set_index('Columnas')
+    return salida.T.rename_axis('Columnas')
 
 
-def tipifica_variables(data:pd.DataFrame, umbral_categorica:int=10, umbral_continua:float=0.1) -> dict:
+def tipifica_variables(data:pd.DataFrame, umbral_categorica:int=10, umbral_continua:float=0.1, describe_data:pd.DataFrame=None) -> dict:
     '''
     Asigna una tipificación sugerida a las variables de un DataFrame en función de su cardinalidad y naturaleza, agrupándolas según su
     posible uso analítico como variables categóricas o numéricas.
@@ -90,6 +216,8 @@ def tipifica_variables(data:pd.DataFrame, umbral_categorica:int=10, umbral_conti
         Umbral de cardinalidad absoluta para considerar una variable como categórica.
     umbral_continua : float, defecto=0.1
         Umbral de cardinalidad relativa a partir del cual una variable numérica se considera continua.
+    describe_data : pandas.DataFrame, opcional
+        Resultado previo de "describe_df" sobre "data"; si se proporciona, no se recalcula y se ignoran los umbrales.
 
     Returns
     -------
@@ -98,14 +226,19 @@ def tipifica_variables(data:pd.DataFrame, umbral_categorica:int=10, umbral_conti
         columnas del DataFrame original asociadas a cada tipo.
     '''
 
-    describe_data = describe_df(data, umbral_categorica, umbral_continua, False)
-    diccionario = {'Categorica_Binaria': [], 'Categorica_Nominal': [], 'Numerica_Discreta': [], 'Numerica_Continua': [], 'Bajo_Interes': []}
-    [diccionario[describe_data.loc['Clasificacion_sugerida', columna]].append(columna) for columna in describe_data.columns]
+    if describe_data is None:
+        describe_data = describe_df(data, umbral_categorica, umbral_continua, False)
+    elif not(isinstance(describe_data, pd.DataFrame)):
+        raise TypeError('La variable "describe_data" debe ser de un DataFrame.')
+
+    clasificacion = describe_data.loc['Clasificacion_sugerida']
+    grupos = clasificacion.groupby(clasificacion, sort=False).groups
+    diccionario = {tipo: grupos[tipo].tolist() if tipo in grupos else [] for tipo in ['Categorica_Binaria', 'Categorica_Nominal', 'Numerica_Discreta', 'Numerica_Continua', 'Bajo_Interes']}
 
     return diccionario
 
 
-def get_features_num_regression(data:pd.DataFrame, target_col:str, umbral_corr:float=0.4, pvalue:float=0.05, variables_tipificadas:dict=None) -> pd.DataFrame:
+def get_features_num_regression(data:pd.DataFrame, target_col:str, umbral_corr:float=0.4, pvalue:float=0.05, variables_tipificadas:dict=None, describe_data:pd.DataFrame=None, precision:str='auto', usar_numba:bool=False) -> pd.DataFrame:
     '''
     Selecciona las variables numéricas de un DataFrame que presentan una relación lineal significativa con una variable objetivo,
     atendiendo a un umbral mínimo de correlación y a un nivel de significación estadística.
@@ -122,6 +255,13 @@ def get_features_num_regression(data:pd.DataFrame, target_col:str, umbral_corr:f
         Nivel de significación estadística máximo permitido en el test de correlación.
     variables_tipificadas : dict, opcional
         Diccionario con la tipificación previa de las variables; si no se proporciona, se calcula internamente.
+    describe_data : pandas.DataFrame, opcional
+        Resultado previo de "describe_df" sobre "data", utilizado para tipificar las variables si no se proporciona "variables_tipificadas".
+    precision : str, defecto='auto'
+        Precisión de la matriz sobre la que se calculan las correlaciones: 'fp64', 'fp32' o 'auto' (float32 solo si las columnas
+        numéricas ocupan más de UMBRAL_FP32 bytes). Las correlaciones y p-values se devuelven siempre en float64.
+    usar_numba : bool, defecto=False
+        Indica si las correlaciones se calculan con el kernel compilado de numba; solo compensa el coste de compilación en matrices grandes.
 
     Returns
     -------
@@ -140,9 +280,17 @@ def get_features_num_regression(data:pd.DataFrame, target_col:str, umbral_corr:f
         raise TypeError('La variable "pvalue" debe ser un número.')
     if not(0 <= pvalue <= 1):
         raise ValueError('El valor de "pvalue" debe estar comprendido entre 0 y 1.')
+    if not(isinstance(precision, str)):
+        raise TypeError('La variable "precision" debe ser un string.')
+    if not(precision in ['auto', 'fp32', 'fp64']):
+        raise ValueError('El valor de "precision" debe ser "auto", "fp32" o "fp64".')
+    if not(isinstance(usar_numba, bool)):
+        raise TypeError('La variable "usar_numba" debe ser True/False.')
+    if usar_numba and not(NUMBA_DISPONIBLE):
+        raise ImportError('Para usar "usar_numba=True" es necesario instalar numba.')
     
     if variables_tipificadas == None:
-        variables_tipificadas = tipifica_variables(data)
+        variables_tipificadas = tipifica_variables(data, describe_data=describe_data)
     elif not(isinstance(variables_tipificadas, dict)):
         raise TypeError('La variable "variables_tipificadas" debe ser de un diccionario.')
 
@@ -152,14 +300,26 @@ def get_features_num_regression(data:pd.DataFrame, target_col:str, umbral_corr:f
     data = data.dropna(axis=0)
 
     columnas_numericas = [columna for numericas in ['Numerica_Continua', 'Numerica_Discreta'] for columna in variables_tipificadas[numericas]]
-    salida = {}
-    for columna in columnas_numericas:
-        if columna != target_col:
-            corr_calc, pvalue_calc = pearsonr(data[columna], data[target_col])
-            if corr_calc >= umbral_corr and pvalue_calc <= pvalue:
-                salida[columna] = [corr_calc, pvalue_calc]
+    if precision == 'auto':
+        precision = 'fp32' if data[columnas_numericas].memory_usage(index=False).sum() > UMBRAL_FP32 else 'fp64'
+    matriz = data[columnas_numericas].to_numpy(dtype=np.float32 if precision == 'fp32' else np.float64)
+    medias, desviaciones = _momentos_columnas(matriz)
+    con_varianza = desviaciones > 0
+    con_varianza[columnas_numericas.index(target_col)] = True
+    if not con_varianza.all():
+        columnas_numericas = [columna for columna, activa in zip(columnas_numericas, con_varianza) if activa]
+        matriz, medias, desviaciones = matriz[:, con_varianza], medias[con_varianza], desviaciones[con_varianza]
+
+    if usar_numba:
+        corr_calc = _pearson_columnas(np.asfortranarray(matriz), matriz[:, columnas_numericas.index(target_col)].copy())
+    else:
+        corr_calc = _correlaciones_objetivo(matriz, columnas_numericas.index(target_col), medias, desviaciones)
+    pvalue_calc = _pvalue_pearson(corr_calc, len(matriz))
+
+    corr_calc[columnas_numericas.index(target_col)] = np.nan
+    seleccion = (np.abs(corr_calc) >= umbral_corr) & (pvalue_calc <= pvalue)
 
-    return pd.DataFrame(salida, index=['Correlacion', 'P_value']).T
+    return pd.DataFrame({'Correlacion': corr_calc[seleccion], 'P_value': pvalue_calc[seleccion]}, index=np.array(columnas_numericas)[seleccion])
 
 
 def plot_features_num_regression(data:pd.DataFrame, target_col:str, columns:list=[], umbral_corr:float=0.4, pvalue:float=0.05) -> list:
@@ -197,25 +357,24 @@ def plot_features_num_regression(data:pd.DataFrame, target_col:str, columns:list
     columns_calc = get_features_num_regression(data, target_col, umbral_corr, pvalue)
 
     columnas_pintar = [col for col in columns if col in columns_calc.index]
-    
-    divisiones = math.ceil(len(columnas_pintar) / 4)
-    for div in range(divisiones):
-        ncols = min(4, len(columnas_pintar)-div*4)
-        _, axs = plt.subplots(ncols=ncols, figsize = (5*ncols, 5))
-        axs = axs if isinstance(axs, np.ndarray) else [axs]
-        for i, ax in enumerate(axs):
-            idx = div * 4 + i
-            sns.scatterplot(data, x=columnas_pintar[idx], y=target_col, ax=ax)
-            ax.set_xlabel(f'{columnas_pintar[idx]} \n corr = {columns_calc.loc[columnas_pintar[idx]]['Correlacion']:.3g} | p-value = {columns_calc.loc[columnas_pintar[idx]]['P_value']:.3g}')
-            if i != 0:
+
+    if columnas_pintar:
+        nrows, ncols = math.ceil(len(columnas_pintar) / 4), min(4, len(columnas_pintar))
+        _, axs = plt.subplots(nrows=nrows, ncols=ncols, squeeze=False, figsize = (5*ncols, 5*nrows))
+        for i, (ax, columna) in enumerate(zip(axs.flat, columnas_pintar)):
+            sns.scatterplot(data, x=columna, y=target_col, ax=ax)
+            ax.set_xlabel(f'{columna} \n corr = {columns_calc.loc[columna]['Correlacion']:.3g} | p-value = {columns_calc.loc[columna]['P_value']:.3g}')
+            if i % 4 != 0:
                 ax.set_ylabel('')
             else:
                 ax.set_ylabel(target_col)
+        for ax in axs.flat[len(columnas_pintar):]:
+            ax.set_visible(False)
 
     return columnas_pintar
 
 
-def get_features_cat_regression(data:pd.DataFrame, target_col:str, pvalue:float=0.05, variables_tipificadas:dict=None) -> pd.DataFrame:
+def get_features_cat_regression(data:pd.DataFrame, target_col:str, pvalue:float=0.05, variables_tipificadas:dict=None, describe_data:pd.DataFrame=None, n_jobs:int=1, usar_numba:bool=False) -> pd.DataFrame:
     '''
     Identifica las variables categóricas de un DataFrame cuya relación con una variable objetivo numérica resulta estadísticamente
     significativa según el test de hipótesis adecuado en cada caso.
@@ -230,6 +389,12 @@ def get_features_cat_regression(data:pd.DataFrame, target_col:str, pvalue:float=
         Nivel de significación estadística máximo permitido en los tests de relación.
     variables_tipificadas : dict, opcional
         Diccionario con la tipificación previa de las variables; si no se proporciona, se calcula internamente.
+    describe_data : pandas.DataFrame, opcional
+        Resultado previo de "describe_df" sobre "data", utilizado para tipificar las variables si no se proporciona "variables_tipificadas".
+    n_jobs : int, defecto=1
+        Número de hilos con los que se reparten los tests por columna; -1 utiliza todos los núcleos disponibles.
+    usar_numba : bool, defecto=False
+        Indica si el ANOVA se calcula con el kernel compilado de numba; solo compensa el coste de compilación en conjuntos grandes.
 
     Returns
     -------
@@ -244,32 +409,74 @@ def get_features_cat_regression(data:pd.DataFrame, target_col:str, pvalue:float=
         raise TypeError('La variable "pvalue" debe ser un número.')
     if not(0 <= pvalue <= 1):
         raise ValueError('El valor de "pvalue" debe estar comprendido entre 0 y 1.')
+    if not(isinstance(n_jobs, int)):
+        raise TypeError('La variable "n_jobs" debe ser un número entero.')
+    if not(n_jobs == -1 or n_jobs >= 1):
+        raise ValueError('El valor de "n_jobs" debe ser -1 o un entero positivo.')
+    if not(isinstance(usar_numba, bool)):
+        raise TypeError('La variable "usar_numba" debe ser True/False.')
+    if usar_numba and not(NUMBA_DISPONIBLE):
+        raise ImportError('Para usar "usar_numba=True" es necesario instalar numba.')
 
     if variables_tipificadas == None:
-        variables_tipificadas = tipifica_variables(data)
+        variables_tipificadas = tipifica_variables(data, describe_data=describe_data)
     elif not(isinstance(variables_tipificadas, dict)):
         raise TypeError('La variable "variables_tipificadas" debe ser de un diccionario.')
 
     if not target_col in variables_tipificadas['Numerica_Continua']:
         raise ValueError('La columna "target_col" debe ser "Numerica_Continua".')
     
-    data = data.dropna(axis=0)
-
     columnas_categoricas = [columna for categoricas in ['Categorica_Binaria', 'Categorica_Nominal'] for columna in variables_tipificadas[categoricas]]
-    salida = {}
-    for columna in columnas_categoricas:
-        if data[columna].nunique() == 2:
-            grupo_a, grupo_b = [data[data[columna] == valor][target_col] for valor in data[columna].unique()]
-
-            _, p_valor = mannwhitneyu(grupo_a, grupo_b)
-            if p_valor <= pvalue:
-                salida[columna] = p_valor
+    categorias = {columna: pd.factorize(data[columna]) for columna in columnas_categoricas}
+    columnas_categoricas = [columna for columna in columnas_categoricas if len(categorias[columna][1]) > 1]
+    y_objetivo = data[target_col].to_numpy(dtype=np.float64, na_value=np.nan)
+    objetivo_valido = ~np.isnan(y_objetivo)
+    y_objetivo = y_objetivo[objetivo_valido] - np.nanmean(y_objetivo)
+    rangos_objetivo, empates_objetivo = _rangos_empates(y_objetivo)
+
+    def p_valor_columna(columna:str) -> float:
+        codigos, valores = categorias[columna]
+        codigos = codigos[objetivo_valido]
+        validas = codigos >= 0
+        if validas.all():
+            y, rangos, termino_empates = y_objetivo, rangos_objetivo, empates_objetivo
+        else:
+            y, codigos = y_objetivo[validas], codigos[validas]
+            rangos, termino_empates = _rangos_empates(y)
+        if len(codigos) < len(data):
+            codigos, valores = pd.factorize(codigos)
+        n, k = len(y), len(valores)
+
+        if k == 2:
+            mascara = codigos == 0
+            n_a = mascara.sum()
+            n_b = n - n_a
+            if min(n_a, n_b) <= 8 and termino_empates == 0:
+                return mannwhitneyu(y[mascara], y[~mascara]).pvalue
+            u_a = rangos[mascara].sum() - n_a * (n_a + 1) / 2
+            u_calc = max(u_a, n_a * n_b - u_a)
+            z_calc = (u_calc - n_a * n_b / 2 - 0.5) / np.sqrt(n_a * n_b / 12 * ((n + 1) - termino_empates / (n * (n - 1))))
+            return min(2 * norm.sf(z_calc), 1.0)
+
+        if usar_numba:
+            f_calc = _anova_codigos(y, codigos, k)
         else:
-            lista = [data[data[columna] == valor][target_col] for valor in data[columna].unique()]
-            _, p_valor = f_oneway(*lista)
-            if p_valor <= pvalue:
-                salida[columna] = p_valor
-            
+            conteos = np.bincount(codigos, minlength=k)
+            medias = np.bincount(codigos, weights=y, minlength=k) / conteos
+            suma_entre = (conteos * (medias - y.mean())**2).sum()
+            suma_dentro = ((y - medias[codigos])**2).sum()
+            with np.errstate(divide='ignore', invalid='ignore'):
+                f_calc = (suma_entre / (k - 1)) / (suma_dentro / (n - k))
+        return f_snedecor.sf(f_calc, k - 1, n - k)
+
+    if n_jobs == 1:
+        p_valores = [p_valor_columna(columna) for columna in columnas_categoricas]
+    else:
+        with ThreadPoolExecutor(max_workers=os.cpu_count() if n_jobs == -1 else n_jobs) as executor:
+            p_valores = list(executor.map(p_valor_columna, columnas_categoricas))
+
+    salida = {columna: p_valor for columna, p_valor in zip(columnas_categoricas, p_valores) if p_valor <= pvalue}
+
     return pd.DataFrame(salida, index=['P_value']).T
 
 
@@ -314,30 +521,26 @@ def plot_features_cat_regression(data:pd.DataFrame, target_col:str, columns:list
     if with_individual_plot:
         for columna in columnas_pintar:
             valores = data[columna].unique()
-            divisiones = math.ceil(len(valores) / 4)
-            for div in range(divisiones):
-                ncols = min(4, len(valores)-div*4)
-                _, axs = plt.subplots(ncols=ncols, figsize = (5*ncols, 5))
-                axs = axs if isinstance(axs, np.ndarray) else [axs]
-                for i, ax in enumerate(axs):
-                    idx = div * 4 + i
-                    sns.kdeplot(data[data[columna] == valores[idx]], x=target_col, ax=ax, fill=True, alpha=0.3)
-                    ax.set_xlabel(valores[idx])
-                    if i != 0:
-                        ax.set_ylabel('')
-                    else:
-                        ax.set_ylabel(f'{columna} \n p-value = {columns_calc.loc[columna]['P_value']:.3g}')
-
-    else:
-        divisiones = math.ceil(len(columnas_pintar) / 2)
-        for div in range(divisiones):
-            ncols = min(2, len(columnas_pintar)-div*2)
-            _, axs = plt.subplots(ncols=ncols, figsize = (10*ncols, 10))
-            axs = axs if isinstance(axs, np.ndarray) else [axs]
-            for i, ax in enumerate(axs):
-                idx = div * 2 + i
-                sns.kdeplot(data, x=target_col, hue=columnas_pintar[idx], ax=ax, fill=True, alpha=0.3)
-                ax.set_xlabel(f'{columnas_pintar[idx]} \n p-value = {columns_calc.loc[columnas_pintar[idx]]['P_value']:.3g}')
-                ax.set_ylabel('')
+            nrows, ncols = math.ceil(len(valores) / 4), min(4, len(valores))
+            _, axs = plt.subplots(nrows=nrows, ncols=ncols, squeeze=False, figsize = (5*ncols, 5*nrows))
+            for i, (ax, valor) in enumerate(zip(axs.flat, valores)):
+                sns.kdeplot(data[data[columna] == valor], x=target_col, ax=ax, fill=True, alpha=0.3)
+                ax.set_xlabel(valor)
+                if i % 4 != 0:
+                    ax.set_ylabel('')
+                else:
+                    ax.set_ylabel(f'{columna} \n p-value = {columns_calc.loc[columna]['P_value']:.3g}')
+            for ax in axs.flat[len(valores):]:
+                ax.set_visible(False)
+
+    elif columnas_pintar:
+        nrows, ncols = math.ceil(len(columnas_pintar) / 2), min(2, len(columnas_pintar))
+        _, axs = plt.subplots(nrows=nrows, ncols=ncols, squeeze=False, figsize = (10*ncols, 10*nrows))
+        for ax, columna in zip(axs.flat, columnas_pintar):
+            sns.kdeplot(data, x=target_col, hue=columna, ax=ax, fill=True, alpha=0.3)
+            ax.set_xlabel(f'{columna} \n p-value = {columns_calc.loc[columna]['P_value']:.3g}')
+            ax.set_ylabel('')
+        for ax in axs.flat[len(columnas_pintar):]:
+            ax.set_visible(False)
     
     return columnas_pintar
\ No newline at end of file